@@ -2,10 +2,34 @@
 Logging utility for the data generator.
 Provides a configured logger instance with proper formatting and output handling.
 """
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 
 
+class CachedTimeFormatter(logging.Formatter):
+    """
+    Formatter that reuses the formatted timestamp for records in the same second.
+    
+    The date format has one-second resolution, so localtime/strftime only
+    need to run when the second changes.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cache = (None, None)
+    
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        second = int(record.created)
+        cached_second, cached_time = self._cache
+        if second != cached_second:
+            cached_time = super().formatTime(record, datefmt)
+            self._cache = (second, cached_time)
+        return cached_time
+
+
 def get_logger(name: str = "data-generator") -> logging.Logger:
     """
     Get or create a logger instance with standardized configuration.
@@ -23,22 +47,31 @@ def get_logger(name: str = "data-generator") -> logging.Logger:
         logger.setLevel(logging.INFO)
         
         # Create console handler with formatting
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setLevel(logging.INFO)
-        
-        # Force unbuffered output for Docker logs
-        if hasattr(sys.stdout, 'reconfigure'):
-            sys.stdout.reconfigure(line_buffering=True)
-        if hasattr(sys.stderr, 'reconfigure'):
-            sys.stderr.reconfigure(line_buffering=True)
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setLevel(logging.INFO)
         
         # Format: [timestamp] LEVEL - message
-        formatter = logging.Formatter(
+        formatter = CachedTimeFormatter(
             fmt='[%(asctime)s] %(levelname)s - %(message)s',
             datefmt='%Y-%m-%dT%H:%M:%S'
         )
-        handler.setFormatter(formatter)
+        stream_handler.setFormatter(formatter)
+        
+        # Hand records to a background thread. QueueHandler.prepare() still
+        # merges %-args and renders tracebacks on the calling thread; only
+        # the prefix/timestamp formatting and the stdout write move to the
+        # listener
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(
+            log_queue, stream_handler, respect_handler_level=True
+        )
+        listener.start()
+        
+        # Drain any queued records before the interpreter exits. atexit
+        # doesn't run on an unhandled SIGTERM (docker stop), so the app
+        # must turn SIGTERM into sys.exit() or queued records are lost
+        atexit.register(listener.stop)
         
-        logger.addHandler(handler)
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
     
     return logger
@@ -1,14 +1,24 @@
 #!/usr/bin/env python3
 """
 Fake data generator for Debezium CDC demo.
-Inserts 1-2 records per second into products and sales tables.
+Inserts 1-2 records per second into products and sales tables, or a
+fixed TARGET_RPS rows per second per table when configured.
 """
+import io
 import os
+import queue
+import signal
+import sys
+import threading
 import time
 import random
+from collections import deque
+from contextlib import contextmanager
+import numpy as np
 from faker import Faker
 import psycopg2
 from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
 
 from logger import get_logger
 
@@ -22,17 +32,59 @@ DB_NAME = os.getenv("DB_NAME", "sourcedb")
 DB_USER = os.getenv("DB_USER", "postgres")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "postgres")
 
+# Connection pool sizing
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "2"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+
+# Number of loop iterations grouped into a single transaction. Values above
+# 1 keep the transaction open across the paced ticks in between, delaying
+# CDC visibility by up to BATCH_ITERS-1 ticks and holding back the xmin
+# horizon meanwhile; meant for bulk / TARGET_RPS runs, not the live demo.
+BATCH_ITERS = max(1, int(os.getenv("BATCH_ITERS", "1")))
+
+# Target rows per second per table (0 keeps the demo's 1-2 rows/sec)
+TARGET_RPS = float(os.getenv("TARGET_RPS", "0"))
+
+# Above this rate each tick sends a full second of rows as one COPY batch
+BULK_RPS_THRESHOLD = 50
+
+# Seconds between progress log lines
+PROGRESS_INTERVAL = 10
+
+# Rows sent per statement by execute_values
+EXECUTE_VALUES_PAGE_SIZE = 1000
+
+# Rows buffered ahead of the insert loop by the background generators
+ROW_QUEUE_SIZE = 1000
+PREFILL_CHUNK_SIZE = 100
+
+# Number of product ids reserved from the products id sequence at a time
+PRODUCT_ID_BLOCK_SIZE = 10_000
+
+# Number of pre-generated Faker values sampled from in the hot loop
+FAKE_POOL_SIZE = 10_000
+
+CATEGORIES = ["Electronics", "Clothing", "Food", "Books", "Home", "Sports", "Toys"]
+
 fake = Faker()
+rng = np.random.default_rng()
 
 logger.info("🔧 Configuration:")
-logger.info(f"   DB_HOST: {DB_HOST}")
-logger.info(f"   DB_PORT: {DB_PORT}")
-logger.info(f"   DB_NAME: {DB_NAME}")
-logger.info(f"   DB_USER: {DB_USER}")
+logger.info("   DB_HOST: %s", DB_HOST)
+logger.info("   DB_PORT: %s", DB_PORT)
+logger.info("   DB_NAME: %s", DB_NAME)
+logger.info("   DB_USER: %s", DB_USER)
+
+# Faker providers are slow, so draw from pre-generated pools instead of
+# calling them for every row
+logger.info("🎲 Pre-generating %d fake names, emails and catch phrases...", FAKE_POOL_SIZE)
+CATCH_PHRASES = np.array([fake.catch_phrase() for _ in range(FAKE_POOL_SIZE)])
+CUSTOMER_NAMES = np.array([fake.name() for _ in range(FAKE_POOL_SIZE)])
+CUSTOMER_EMAILS = np.array([fake.email() for _ in range(FAKE_POOL_SIZE)])
 
 
-def get_db_connection():
-    """Create database connection with retry logic."""
+def get_db_pool():
+    """Create a threaded connection pool with retry logic."""
     max_retries = 5
     retry_delay = 2
     
@@ -40,26 +92,43 @@ def get_db_connection():
     
     for attempt in range(max_retries):
         try:
-            logger.info(f"   Attempt {attempt + 1}/{max_retries}...")
-            conn = psycopg2.connect(
+            logger.info("   Attempt %d/%d...", attempt + 1, max_retries)
+            pool = ThreadedConnectionPool(
+                minconn=DB_POOL_MIN,
+                maxconn=DB_POOL_MAX,
                 host=DB_HOST,
                 port=DB_PORT,
                 dbname=DB_NAME,
                 user=DB_USER,
                 password=DB_PASSWORD
             )
-            logger.info(f"✅ Connected to PostgreSQL at {DB_HOST}:{DB_PORT}/{DB_NAME}")
-            return conn
+            logger.info("✅ Connected to PostgreSQL at %s:%s/%s (pool %d-%d)",
+                        DB_HOST, DB_PORT, DB_NAME, DB_POOL_MIN, DB_POOL_MAX)
+            return pool
         except psycopg2.OperationalError as e:
-            logger.error(f"❌ Connection failed: {e}")
+            logger.error("❌ Connection failed: %s", e)
             if attempt < max_retries - 1:
-                logger.info(f"⏳ Retrying in {retry_delay}s...")
+                logger.info("⏳ Retrying in %ds...", retry_delay)
                 time.sleep(retry_delay)
             else:
-                logger.critical(f"💥 Failed to connect after {max_retries} attempts")
+                logger.critical("💥 Failed to connect after %d attempts", max_retries)
                 raise Exception(f"Failed to connect after {max_retries} attempts: {e}")
 
 
+@contextmanager
+def borrow_connection(pool):
+    """Borrow a connection from the pool, rolling back and returning it when done."""
+    conn = pool.getconn()
+    try:
+        yield conn
+    except Exception:
+        # Don't hand a connection with an aborted transaction back to the pool
+        conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn)
+
+
 def create_tables(conn):
     """Create products and sales tables if they don't exist."""
     logger.info("📋 Creating/verifying tables...")
@@ -92,145 +161,309 @@ def create_tables(conn):
         """)
         logger.info("   ✓ sales table ready")
         
-        # Set replica identity to FULL for CDC with before/after values
-        cur.execute("ALTER TABLE products REPLICA IDENTITY FULL")
-        logger.info("   ✓ products replica identity set to FULL")
+        # Use primary-key replica identity: the generator only inserts, and
+        # Debezium captures the full row image for inserts regardless. FULL
+        # would only add the whole old row to WAL on UPDATE/DELETE.
+        cur.execute("ALTER TABLE products REPLICA IDENTITY DEFAULT")
+        logger.info("   ✓ products replica identity set to DEFAULT")
         
-        cur.execute("ALTER TABLE sales REPLICA IDENTITY FULL")
-        logger.info("   ✓ sales replica identity set to FULL")
+        cur.execute("ALTER TABLE sales REPLICA IDENTITY DEFAULT")
+        logger.info("   ✓ sales replica identity set to DEFAULT")
         
         conn.commit()
         logger.info("✅ Tables created/verified successfully")
 
 
-def generate_product():
-    """Generate fake product data."""
-    categories = ["Electronics", "Clothing", "Food", "Books", "Home", "Sports", "Toys"]
-    return {
-        "name": fake.catch_phrase(),
-        "category": random.choice(categories),
-        "price": round(random.uniform(5.99, 999.99), 2),
-        "stock_quantity": random.randint(0, 500)
-    }
+def generate_products_bulk(n, rng=rng):
+    """Generate n fake product rows as (name, category, price, stock_quantity) tuples."""
+    names = rng.choice(CATCH_PHRASES, n)
+    categories = rng.choice(CATEGORIES, n)
+    prices = np.round(rng.uniform(5.99, 999.99, n), 2)
+    stocks = rng.integers(0, 501, n)
+    # tolist() hands psycopg2 native Python types rather than NumPy scalars
+    return list(zip(names.tolist(), categories.tolist(), prices.tolist(), stocks.tolist()))
+
+
+def generate_sales_bulk(n, rng=rng):
+    """Generate n fake sale rows as (customer_name, customer_email, quantity, total_amount) tuples."""
+    customers = rng.integers(0, FAKE_POOL_SIZE, n)
+    quantities = rng.integers(1, 11, n)
+    prices = rng.uniform(5.99, 999.99, n)
+    totals = np.round(np.round(prices, 2) * quantities, 2)
+    return list(zip(
+        CUSTOMER_NAMES[customers].tolist(),
+        CUSTOMER_EMAILS[customers].tolist(),
+        quantities.tolist(),
+        totals.tolist()
+    ))
+
+
+product_row_queue = queue.Queue(maxsize=ROW_QUEUE_SIZE)
+sale_row_queue = queue.Queue(maxsize=ROW_QUEUE_SIZE)
+
+
+def prefill_rows(row_queue, generate_rows):
+    """Keep row_queue topped up with generated rows. Runs on a daemon thread."""
+    # NumPy Generators aren't thread-safe, so each producer gets its own
+    thread_rng = np.random.default_rng()
+    while True:
+        for row in generate_rows(PREFILL_CHUNK_SIZE, thread_rng):
+            row_queue.put(row)
+
+
+def start_prefill_threads():
+    """Start background generators for the product and sale row queues."""
+    for name, row_queue, generate_rows in (
+        ("prefill-products", product_row_queue, generate_products_bulk),
+        ("prefill-sales", sale_row_queue, generate_sales_bulk),
+    ):
+        threading.Thread(
+            target=prefill_rows, args=(row_queue, generate_rows), name=name, daemon=True
+        ).start()
+
+
+def take_rows(row_queue, generate_rows, count):
+    """Pop count pre-generated rows, generating any shortfall inline."""
+    rows = []
+    try:
+        for _ in range(count):
+            rows.append(row_queue.get_nowait())
+    except queue.Empty:
+        rows.extend(generate_rows(count - len(rows)))
+    return rows
+
+
+def _copy_escape(value):
+    """Escape a value for PostgreSQL COPY text format."""
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _copy_buffer(rows):
+    """Build an in-memory tab-separated buffer for COPY FROM STDIN."""
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join(_copy_escape(v) for v in row))
+        buf.write("\n")
+    buf.seek(0)
+    return buf
 
 
-def generate_sale(product_ids):
-    """Generate fake sale data."""
-    quantity = random.randint(1, 10)
-    price = round(random.uniform(5.99, 999.99), 2)
-    return {
-        "product_id": random.choice(product_ids) if product_ids else None,
-        "customer_name": fake.name(),
-        "customer_email": fake.email(),
-        "quantity": quantity,
-        "total_amount": round(price * quantity, 2)
-    }
+# Product ids reserved from the sequence but not yet handed out
+_reserved_product_ids = deque()
+
+
+def reserve_product_ids(cur, count):
+    """Take product ids from a locally cached block of the products id sequence."""
+    if len(_reserved_product_ids) < count:
+        cur.execute(
+            "SELECT nextval(pg_get_serial_sequence('products', 'id')) FROM generate_series(1, %s)",
+            (max(count, PRODUCT_ID_BLOCK_SIZE),)
+        )
+        _reserved_product_ids.extend(row[0] for row in cur.fetchall())
+    return [_reserved_product_ids.popleft() for _ in range(count)]
 
 
-def insert_products(conn, count=2):
-    """Insert fake products into the database."""
-    products = [generate_product() for _ in range(count)]
+def insert_products(cur, count=2):
+    """Insert fake products using the given cursor. The caller owns the commit."""
+    # Ids are assigned client-side so COPY can be used without RETURNING
+    inserted_ids = reserve_product_ids(cur, count)
+    product_rows = take_rows(product_row_queue, generate_products_bulk, count)
+    rows = [(product_id, *row) for product_id, row in zip(inserted_ids, product_rows)]
     
-    with conn.cursor() as cur:
+    if count < 2:
         execute_values(
             cur,
             """
-            INSERT INTO products (name, category, price, stock_quantity)
+            INSERT INTO products (id, name, category, price, stock_quantity)
             VALUES %s
-            RETURNING id
             """,
-            [(p["name"], p["category"], p["price"], p["stock_quantity"]) for p in products]
+            rows,
+            template="(%s, %s, %s, %s, %s)",
+            page_size=EXECUTE_VALUES_PAGE_SIZE
+        )
+    else:
+        cur.copy_expert(
+            "COPY products (id, name, category, price, stock_quantity) FROM STDIN WITH (FORMAT text)",
+            _copy_buffer(rows)
         )
-        inserted_ids = [row[0] for row in cur.fetchall()]
-        conn.commit()
     
-    logger.debug(f"📦 Inserted {count} products (IDs: {inserted_ids})")
+    logger.debug("📦 Inserted %d products (IDs: %s)", count, inserted_ids)
     return inserted_ids
 
 
-def insert_sales(conn, product_ids, count=2):
-    """Insert fake sales into the database."""
-    sales = [generate_sale(product_ids) for _ in range(count)]
+def insert_sales(cur, product_ids, count=2):
+    """Insert fake sales using the given cursor. The caller owns the commit."""
+    if product_ids:
+        sale_product_ids = rng.choice(product_ids, count).tolist()
+    else:
+        sale_product_ids = [None] * count
+    sale_rows = take_rows(sale_row_queue, generate_sales_bulk, count)
+    rows = [(product_id, *row) for product_id, row in zip(sale_product_ids, sale_rows)]
     
-    with conn.cursor() as cur:
+    if count < 2:
         execute_values(
             cur,
             """
             INSERT INTO sales (product_id, customer_name, customer_email, quantity, total_amount)
             VALUES %s
-            RETURNING id
             """,
-            [(s["product_id"], s["customer_name"], s["customer_email"], 
-              s["quantity"], s["total_amount"]) for s in sales]
+            rows,
+            template="(%s, %s, %s, %s, %s)",
+            page_size=EXECUTE_VALUES_PAGE_SIZE
+        )
+    else:
+        cur.copy_expert(
+            "COPY sales (product_id, customer_name, customer_email, quantity, total_amount) FROM STDIN WITH (FORMAT text)",
+            _copy_buffer(rows)
         )
-        inserted_ids = [row[0] for row in cur.fetchall()]
-        conn.commit()
     
-    logger.debug(f"💰 Inserted {count} sales (IDs: {inserted_ids})")
+    logger.debug("💰 Inserted %d sales", count)
 
 
-def get_random_product_ids(conn, limit=100):
-    """Get random product IDs for generating sales."""
-    with conn.cursor() as cur:
-        cur.execute("SELECT id FROM products ORDER BY RANDOM() LIMIT %s", (limit,))
-        return [row[0] for row in cur.fetchall()]
+def get_tick_schedule():
+    """
+    Return (tick interval in seconds, rows per table per tick).
+    
+    Rows per tick is None in demo mode, where each tick inserts 1-2 rows.
+    """
+    if TARGET_RPS > BULK_RPS_THRESHOLD:
+        return 1.0, round(TARGET_RPS)
+    if TARGET_RPS > 0:
+        return 1.0 / TARGET_RPS, 1
+    return 1.0, None
+
+
+def wait_for_tick(next_tick, tick_interval, now):
+    """
+    Sleep until the tick after next_tick and return its scheduled time.
+    
+    Sleeping until a scheduled tick, rather than for a fixed interval, keeps
+    the time spent inserting from drifting the rate below target.
+    """
+    next_tick += tick_interval
+    delay = next_tick - now
+    if delay > 0:
+        time.sleep(delay)
+    elif delay < -tick_interval:
+        # Too far behind to catch up; don't burst, resync instead
+        next_tick = now
+    return next_tick
+
+
+def handle_sigterm(signum, frame):
+    """Exit normally on SIGTERM so cleanup and the atexit log drain run."""
+    sys.exit(0)
 
 
 def main():
+    # docker stop sends SIGTERM; without a handler the process dies before
+    # the pool is closed and queued log records are flushed
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    
     logger.info("🚀 Starting Debezium data generator...")
     
     # Connect to database
-    conn = get_db_connection()
+    pool = get_db_pool()
     
-    # Create tables
-    create_tables(conn)
+    with borrow_connection(pool) as conn:
+        # Create tables
+        create_tables(conn)
+        
+        # Seed some initial products
+        logger.info("🌱 Seeding initial products...")
+        with conn, conn.cursor() as cur:
+            product_ids = insert_products(cur, count=20)
+    logger.info("✅ Seeded %d initial products", len(product_ids))
     
-    # Seed some initial products
-    logger.info("🌱 Seeding initial products...")
-    product_ids = insert_products(conn, count=20)
-    logger.info(f"✅ Seeded {len(product_ids)} initial products")
+    # Generate rows on background threads so it overlaps with database I/O
+    start_prefill_threads()
     
-    logger.info("📊 Starting continuous data generation (1-2 records/sec per table)...")
+    tick_interval, rows_per_tick = get_tick_schedule()
+    if rows_per_tick is None:
+        logger.info("📊 Starting continuous data generation (1-2 records/sec per table)...")
+    else:
+        logger.info("📊 Starting continuous data generation (%d records every %.3fs per table)...",
+                    rows_per_tick, tick_interval)
     logger.info("💡 Press Ctrl+C to stop")
     
     iteration = 0
+    next_tick = time.monotonic()
+    next_progress = next_tick + PROGRESS_INTERVAL
     total_products = len(product_ids)
     total_sales = 0
     
     try:
-        while True:
-            iteration += 1
-            
-            # Insert 1-2 products
-            product_count = random.randint(1, 2)
-            new_product_ids = insert_products(conn, count=product_count)
-            product_ids.extend(new_product_ids)
-            total_products += product_count
-            
-            # Keep a reasonable pool of product IDs
-            if len(product_ids) > 100:
-                product_ids = get_random_product_ids(conn, limit=100)
-            
-            # Insert 1-2 sales
-            sale_count = random.randint(1, 2)
-            insert_sales(conn, product_ids, count=sale_count)
-            total_sales += sale_count
-            
-            if iteration % 10 == 0:
-                logger.info(f"📈 Progress: {total_products} products, {total_sales} sales (iteration {iteration})")
-            
-            # Sleep 1 second between batches
-            time.sleep(1)
+        # The generation loop is single-threaded, so hold one connection and
+        # reuse its cursors for every iteration
+        with borrow_connection(pool) as conn:
+            products_cur = conn.cursor()
+            sales_cur = conn.cursor()
+            try:
+                while True:
+                    batch_products = 0
+                    batch_sales = 0
+                    
+                    # Group BATCH_ITERS iterations into one transaction so their
+                    # inserts share a single commit (and WAL fsync)
+                    with conn:
+                        for batch_iteration in range(BATCH_ITERS):
+                            iteration += 1
+                            
+                            # Insert 1-2 products, or the configured rate
+                            product_count = rows_per_tick or random.randint(1, 2)
+                            new_product_ids = insert_products(products_cur, count=product_count)
+                            product_ids.extend(new_product_ids)
+                            batch_products += product_count
+                            
+                            # Keep a reasonable pool of product IDs, downsampled locally
+                            # rather than re-reading the whole table with ORDER BY RANDOM()
+                            if len(product_ids) > 200:
+                                product_ids = random.sample(product_ids, 100)
+                            
+                            # Insert 1-2 sales, or the configured rate
+                            sale_count = rows_per_tick or random.randint(1, 2)
+                            insert_sales(sales_cur, product_ids, count=sale_count)
+                            batch_sales += sale_count
+                            
+                            # Pace between iterations of a batch; the last one
+                            # waits after the commit so rows aren't held back
+                            if batch_iteration < BATCH_ITERS - 1:
+                                next_tick = wait_for_tick(next_tick, tick_interval, time.monotonic())
+                    
+                    # Only count rows once their transaction has committed
+                    total_products += batch_products
+                    total_sales += batch_sales
+                    
+                    # Measure after the commit so its latency counts against
+                    # the schedule instead of being hidden inside the tick
+                    now = time.monotonic()
+                    if now >= next_progress:
+                        logger.info("📈 Progress: %d products, %d sales (iteration %d)",
+                                    total_products, total_sales, iteration)
+                        next_progress = now + PROGRESS_INTERVAL
+                    
+                    next_tick = wait_for_tick(next_tick, tick_interval, now)
+            finally:
+                products_cur.close()
+                sales_cur.close()
             
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, SystemExit):
         logger.info("⏹ Stopping data generator...")
     except Exception as e:
-        logger.exception(f"💥 Error occurred: {e}")
+        logger.exception("💥 Error occurred: %s", e)
         raise
     finally:
-        conn.close()
-        logger.info("✅ Database connection closed")
-        logger.info(f"📊 Final stats: {total_products} products, {total_sales} sales")
+        pool.closeall()
+        logger.info("✅ Database connection pool closed")
+        logger.info("📊 Final stats: %d products, %d sales", total_products, total_sales)
 
 
 if __name__ == "__main__":